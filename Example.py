@@ -1,100 +1,210 @@
 import re
+import sys
+import functools
+from collections import namedtuple
 
-import re
+try:
+    import numpy as np
+except ImportError:
+    np = None
+
+# Parsed process nodes; dispatch on them with isinstance(). Variable names
+# stored in them are interned so repeats share one object and resolve
+# against input dicts by identity before any string compare.
+Repeat = namedtuple('Repeat', 'repeats for_loops')
+ForLoop = namedtuple('ForLoop', 'start end step commands')
+Mean = namedtuple('Mean', 'r')
+Delay = namedtuple('Delay', 'd')
+Output = namedtuple('Output', 'pairs')
+
+# Whitespace is insignificant in process strings; strip it in one pass
+_WS_TABLE = str.maketrans('', '', ' \n\t\r')
+
+# Only parens and commas matter to split_commands; the regex engine skips
+# every other character in C instead of one bytecode dispatch per char
+_SPLIT_TOKEN_RE = re.compile(r'[(),]')
+
+# Below this length the plain loop beats the numpy setup cost
+_VECTOR_SPLIT_MIN_LEN = 256
+
+def _split_commands_np(cmd_str):
+    """Vectorized split_commands: paren depth via cumsum, then mask top-level commas."""
+    b = np.frombuffer(cmd_str.encode('ascii'), dtype=np.uint8)
+    depth = np.cumsum((b == ord('(')).astype(np.intp) - (b == ord(')')))
+    splits = np.flatnonzero((b == ord(',')) & (depth == 0)).tolist()
+    starts = [0] + [i + 1 for i in splits]
+    ends = splits + [len(cmd_str)]
+    res = [cmd_str[a:e] for a, e in zip(starts, ends)]
+    if starts[-1] == len(cmd_str):
+        res.pop()
+    return tuple(res)
 
+@functools.lru_cache(maxsize=256)
 def split_commands(cmd_str):
-    """Split by commas but ignore commas inside parentheses."""
+    """Split by commas but ignore commas inside parentheses.
+
+    Cached, so the result is an immutable tuple.
+    """
+    if np is not None and len(cmd_str) >= _VECTOR_SPLIT_MIN_LEN and cmd_str.isascii():
+        return _split_commands_np(cmd_str)
     res = []
-    current = ""
+    start = 0
     parens = 0
-    for c in cmd_str:
+    for m in _SPLIT_TOKEN_RE.finditer(cmd_str):
+        c = m.group()
+        i = m.start()
         if c == '(':
             parens += 1
         elif c == ')':
             parens -= 1
-        if c == ',' and parens == 0:
-            res.append(current)
-            current = ""
-        else:
-            current += c
-    if current:
-        res.append(current)
-    return res
+        elif c == ',' and parens == 0:
+            res.append(cmd_str[start:i])
+            start = i + 1
+    if start < len(cmd_str):
+        res.append(cmd_str[start:])
+    return tuple(res)
+
+def _scan_braced(s, start, open_c='{', close_c='}'):
+    """Return the index of the bracket closing the one at s[start], or -1."""
+    depth = 0
+    for i in range(start, len(s)):
+        c = s[i]
+        if c == open_c:
+            depth += 1
+        elif c == close_c:
+            depth -= 1
+            if depth == 0:
+                return i
+    return -1
+
+def _parse_outputs(cmd_param):
+    # key=value pairs rarely nest parens, so plain str.split usually suffices
+    pairs = cmd_param.split(',') if '(' not in cmd_param else split_commands(cmd_param)
+    return dict(p.split('=', 1) for p in pairs if '=' in p)
+
+_DISPATCH = {
+    'MEAN': lambda p: Mean(sys.intern(p)),
+    'DELAY': lambda p: Delay(sys.intern(p)),
+    'OUTPUT': lambda p: Output(_parse_outputs(p)),
+}
+
+def _close_repeat(header, items):
+    return Repeat(sys.intern(header), items)
 
+def _close_for(header, items):
+    bounds = header.split(',', 2)
+    if len(bounds) != 3:
+        return None
+    start_var, end_var, step_var = map(sys.intern, bounds)
+    return ForLoop(start_var, end_var, step_var, items)
+
+# The block nesting is fixed: (keyword, node builder) for each depth, and
+# the innermost bodies hold commands
+_GRAMMAR = (
+    ("REPEAT", _close_repeat),
+    ("FOR_RANGEV", _close_for),
+)
+
+def _block_tok(keyword):
+    # Only this depth's keyword and braces matter; the regex engine skips any
+    # other text. A keyword from another depth never tokenizes, so its block
+    # is skipped whole as an unknown {...}.
+    return re.compile(r'(?P<kw>%s)\((?P<hdr>[^)]*)\)\{|(?P<open>\{)|(?P<end>\})' % keyword)
+
+# Tokenizer per nesting depth, specialized once at import
+_LEVEL_TOK = [_block_tok(keyword) for keyword, _ in _GRAMMAR]
+_LEVEL_TOK.append(re.compile(r'(?P<cmd>\w+)\(|(?P<open>\{)|(?P<end>\})'))
+_LEVEL_SEARCH = tuple(tok.search for tok in _LEVEL_TOK)
+_CMD_DEPTH = len(_GRAMMAR)
+
+@functools.lru_cache(maxsize=32)
 def parse_process(process_str):
-    s = process_str.replace(" ", "").replace("\n", "")
-    repeat_pattern = re.compile(r'REPEAT\((\w+)\)\{(.*?)\}(?=:|$)')
-    repeat_matches = repeat_pattern.findall(s)
-    parsed = []
-
-    for repeat_var, inner_content in repeat_matches:
-        for_blocks = re.findall(r'FOR_RANGEV\(([^,]+),([^,]+),([^)]+)\)\{(.*?)\}', inner_content)
-        for_list = []
-
-        for start_var, end_var, step_var, commands_str in for_blocks:
-            commands_raw = split_commands(commands_str)
-            commands = []
-
-            for cmd in commands_raw:
-                cmatch = re.match(r'(\w+)\((.*)\)', cmd)
-                if not cmatch:
-                    continue
-                cmd_type = cmatch.group(1).upper()
-                cmd_param = cmatch.group(2)
-
-                if cmd_type == "MEAN":
-                    commands.append({"mean": cmd_param})
-                elif cmd_type == "DELAY":
-                    commands.append({"delay": cmd_param})
-                elif cmd_type == "OUTPUT":
-                    outputs = {}
-                    pairs = split_commands(cmd_param)
-                    for pair in pairs:
-                        if '=' in pair:
-                            key, val = pair.split('=', 1)
-                            outputs[key] = val
-                    commands.append({"outputs": outputs})
-
-            for_list.append({
-                "start": start_var,
-                "end": end_var,
-                "step": step_var,
-                "commands": commands
-            })
-
-        parsed.append({
-            "repeats": repeat_var,
-            "for_loops": for_list
-        })
-
-    return parsed
-
-
-# --- Test ---
-process_str = """REPEAT(C){
-    FOR_RANGEV(Vi,Vf,Vr){
-        MEAN(R),
-        DELAY(D),
-        OUTPUT(Vout=V,Iout=I)
-    };
-    FOR_RANGEV(Vi,Vf,Vr){
-        MEAN(R),
-        DELAY(D),
-        OUTPUT(Vout=V,Iout=I)
-    }
-    }:
-    REPEAT(C){
-    FOR_RANGEV(Vi,Vf,Vr){
-        MEAN(R),
-        DELAY(D),
-        OUTPUT(Vout=V,Iout=I)
-    };
-    FOR_RANGEV(Vi,Vf,Vr){
-        MEAN(R),
-        DELAY(D),
-        OUTPUT(Vout=V,Iout=I)
-    }
-}"""
-
-import pprint
-pprint.pprint(parse_process(process_str))
+    """Parse a process string, cached on the raw input.
+
+    The same (shared) list is returned for repeated inputs, so callers must
+    not mutate the result.
+    """
+    return list(iter_process(process_str))
+
+def iter_process(process_str):
+    """Yield each REPEAT block as soon as it is parsed.
+
+    The tokenizer for the current nesting depth drives a small state machine
+    over the string; open blocks live on a stack. Lets a caller start
+    executing the first block before the rest of the string has been parsed.
+    """
+    s = process_str.translate(_WS_TABLE)
+    # Each open block is (header, items); its depth is its stack position
+    stack = []
+    # Hot-loop lookups bound to locals
+    level_search = _LEVEL_SEARCH
+    scan_braced = _scan_braced
+    dispatch_get = _DISPATCH.get
+
+    i = 0
+    while True:
+        depth = len(stack)
+        m = level_search[depth](s, i)
+        if m is None:
+            return
+        i = m.end()
+
+        if m.group('end'):
+            if not stack:
+                continue
+            node = _GRAMMAR[depth - 1][1](*stack.pop())
+            if node is None:
+                continue
+            if stack:
+                stack[-1][1].append(node)
+            else:
+                yield node
+        elif m.group('open'):
+            # Unknown {...} block: skip it whole
+            close = scan_braced(s, m.start())
+            if close == -1:
+                return
+            i = close + 1
+        elif depth == _CMD_DEPTH:
+            lparen = i - 1
+            close = scan_braced(s, lparen, '(', ')')
+            if close == -1:
+                continue
+            i = close + 1
+            name = m.group('cmd')
+            # Names are normally uppercase already; only pay for .upper() on a miss
+            handler = dispatch_get(name) or dispatch_get(name.upper())
+            if handler is not None:
+                stack[-1][1].append(handler(s[lparen + 1:close]))
+        else:
+            stack.append((m.group('hdr'), []))
+
+if __name__ == "__main__":
+    # --- Test ---
+    process_str = """REPEAT(C){
+        FOR_RANGEV(Vi,Vf,Vr){
+            MEAN(R),
+            DELAY(D),
+            OUTPUT(Vout=V,Iout=I)
+        };
+        FOR_RANGEV(Vi,Vf,Vr){
+            MEAN(R),
+            DELAY(D),
+            OUTPUT(Vout=V,Iout=I)
+        }
+        }:
+        REPEAT(C){
+        FOR_RANGEV(Vi,Vf,Vr){
+            MEAN(R),
+            DELAY(D),
+            OUTPUT(Vout=V,Iout=I)
+        };
+        FOR_RANGEV(Vi,Vf,Vr){
+            MEAN(R),
+            DELAY(D),
+            OUTPUT(Vout=V,Iout=I)
+        }
+    }"""
+
+    import pprint
+    pprint.pprint(parse_process(process_str))
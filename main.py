@@ -4,19 +4,28 @@
 
 
 import os
+import functools
+import queue
 import threading
+import traceback
 import time
+from concurrent.futures import ThreadPoolExecutor
 import importlib.util
 import customtkinter as ctk
 from tkinter import messagebox
-from tkinter import simpledialog
 import json
 from matplotlib.backends.backend_tkagg import FigureCanvasTkAgg
-import matplotlib.pyplot as plt
+from matplotlib.figure import Figure
+import numpy as np
 import re
 import csv
 import pyvisa
 
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
 # -----------------------
 # Config
 # -----------------------
@@ -24,9 +33,23 @@ APP_NAME = "EGG_273A_Potentiostat"
 DATA_FOLDER = "Data"
 METHODS_FOLDER = "Methods"
 WINDOW_SIZE = "900x640"
-METHODS_PATHS = ["Methods/BuiltIn", "Methods/Custom"]
+# Joined once here; new methods are saved to CUSTOM_METHODS_FOLDER
+CUSTOM_METHODS_FOLDER = os.path.join(METHODS_FOLDER, "Custom")
+METHODS_PATHS = [os.path.join(METHODS_FOLDER, "BuiltIn"), CUSTOM_METHODS_FOLDER]
 
 DEBUGGING = True
+# List symlinked user/project folders too (costs a stat per symlink)
+FOLLOW_SYMLINKS = False
+# Ask for ID, VER and ERR in one "ID;VER;ERR" request; only for firmware known to chain commands
+COMPOUND_ID_QUERY = False
+
+# Process-string patterns, compiled once
+_REPEAT_RE = re.compile(r'REPEAT\((\w+)\)\{(.*?)\}(?=:|$)')
+_FOR_RE = re.compile(r'FOR_RANGEV\(([^,]+),([^,]+),([^)]+)\)\{(.*?)\}')
+_CMD_RE = re.compile(r'(\w+)\((.*)\)')
+_WS_TABLE = str.maketrans('', '', ' \n\t\r')
+# Run number at the end of a data file name, e.g. "exp_003.csv"
+_NUM_RE = re.compile(r"_(\d+)\.csv$")
 
 # -----------------------
 # Helpers
@@ -35,29 +58,168 @@ def module_exists(name):
     """Return True if module can be imported."""
     return importlib.util.find_spec(name) is not None
 
-def safe_list_resources():
-    """Try to list VISA resources if pyvisa available, else return []"""
+def safe_list_resources(rm=None):
+    """Try to list VISA resources (on rm if given) if pyvisa available, else return []"""
     try:
-        rm = pyvisa.ResourceManager()
+        if rm is None:
+            rm = pyvisa.ResourceManager()
         return list(rm.list_resources())
     except Exception:
         return []
+
+def read_json(path):
+    """Parse a JSON file, with orjson when it is installed."""
+    if orjson is not None:
+        with open(path, "rb") as f:
+            return orjson.loads(f.read())
+    with open(path, "r", encoding="utf-8") as f:
+        return json.load(f)
+
+def write_json(obj, path):
+    """Write obj as 2-space indented JSON, with orjson when it is installed."""
+    if orjson is not None:
+        data = orjson.dumps(obj, option=orjson.OPT_INDENT_2)
+    else:
+        data = json.dumps(obj, indent=2).encode("utf-8")
+    # One-shot write straight to the fd, no buffered/text wrapper layers
+    fd = os.open(path, os.O_WRONLY | os.O_CREAT | os.O_TRUNC | getattr(os, "O_BINARY", 0) | getattr(os, "O_CLOEXEC", 0), 0o644)
+    try:
+        view = memoryview(data)
+        while view:
+            view = view[os.write(fd, view):]
+    finally:
+        os.close(fd)
+
+# Parsed method files: path -> (st_mtime_ns, st_size, data)
+_METHOD_CACHE = {}
+
 def load_methods():
-    """Load all method JSON files from both folders."""
+    """Load all method JSON files from both folders.
+
+    Files are only re-parsed when their mtime or size changed since the last call.
+    """
     methods = []
     for folder in METHODS_PATHS:
         if os.path.exists(folder):
-            for f in os.listdir(folder):
-                if f.endswith(".json"):
-                    path = os.path.join(folder, f)
-                    try:
-                        with open(path, "r") as file:
-                            data = json.load(file)
+            with os.scandir(folder) as entries:
+                for entry in entries:
+                    if entry.name.endswith(".json"):
+                        path = entry.path
+                        try:
+                            st = entry.stat()
+                            cached = _METHOD_CACHE.get(path)
+                            if cached and cached[0] == st.st_mtime_ns and cached[1] == st.st_size:
+                                methods.append(cached[2])
+                                continue
+                            data = read_json(path)
+                            _METHOD_CACHE[path] = (st.st_mtime_ns, st.st_size, data)
                             methods.append(data)
-                    except Exception as e:
-                        print(f"Error reading {path}: {e}")
+                        except Exception as e:
+                            print(f"Error reading {path}: {e}")
     return methods
 
+# Subfolder listings: path -> (st_mtime_ns, names)
+_dir_cache = {}
+
+def list_subdirs(path):
+    """Names of the folders directly inside path.
+
+    Cached on the directory's mtime; callers must not mutate the list.
+    """
+    key = os.stat(path).st_mtime_ns
+    cached = _dir_cache.get(path)
+    if cached and cached[0] == key:
+        return cached[1]
+    # DirEntry.is_dir() reuses readdir's type info instead of a stat per entry;
+    # only following symlinks needs a stat
+    with os.scandir(path) as it:
+        names = [e.name for e in it if e.is_dir(follow_symlinks=FOLLOW_SYMLINKS)]
+    _dir_cache[path] = (key, names)
+    return names
+
+def valid_folder_name(name):
+    """True if name is a single path component, so it maps to one listing entry."""
+    seps = [sep for sep in (os.sep, os.altsep) if sep]
+    return name not in (".", "..") and not any(sep in name for sep in seps)
+
+def add_subdir(path, name):
+    """Record a folder just created inside path without rescanning path.
+
+    Returns the updated listing.
+    """
+    cached = _dir_cache.get(path)
+    if cached is None:
+        return list_subdirs(path)
+    if name in cached[1]:
+        return cached[1]
+    names = cached[1] + [name]
+    _dir_cache[path] = (os.stat(path).st_mtime_ns, names)
+    return names
+
+def split_commands(cmd_str):
+    """Split by commas but ignore commas inside parentheses."""
+    res = []
+    start = 0
+    parens = 0
+    for i, c in enumerate(cmd_str):
+        if c == '(':
+            parens += 1
+        elif c == ')':
+            parens -= 1
+        elif c == ',' and parens == 0:
+            # slice the piece out instead of growing a string char by char
+            res.append(cmd_str[start:i])
+            start = i + 1
+    if start < len(cmd_str):
+        res.append(cmd_str[start:])
+    return res
+
+@functools.lru_cache(maxsize=256)
+def parse_process(process_str):
+    """Parse a method process string; cached, so callers must not mutate the result."""
+    s = process_str.translate(_WS_TABLE)
+    parsed = []
+
+    # finditer: one match at a time, no intermediate lists of tuples
+    for rmatch in _REPEAT_RE.finditer(s):
+        repeat_var, inner_content = rmatch.groups()
+        for_list = []
+
+        for fmatch in _FOR_RE.finditer(inner_content):
+            start_var, end_var, step_var, commands_str = fmatch.groups()
+            commands_raw = split_commands(commands_str)
+            commands = []
+
+            for cmd in commands_raw:
+                cmatch = _CMD_RE.match(cmd)
+                if not cmatch:
+                    continue
+                cmd_type = cmatch.group(1).upper()
+                cmd_param = cmatch.group(2)
+
+                if cmd_type == "MEAN":
+                    commands.append({"mean": cmd_param})
+                elif cmd_type == "DELAY":
+                    commands.append({"delay": cmd_param})
+                elif cmd_type == "OUTPUT":
+                    pairs = split_commands(cmd_param)
+                    outputs = dict(pair.split('=', 1) for pair in pairs if '=' in pair)
+                    commands.append({"outputs": outputs})
+
+            for_list.append({
+                "start": start_var,
+                "end": end_var,
+                "step": step_var,
+                "commands": commands
+            })
+
+        parsed.append({
+            "repeats": repeat_var,
+            "for_loops": for_list
+        })
+
+    return parsed
+
 class SafeFrame(ctk.CTkFrame):
     def __init__(self, master, **kwargs):
         super().__init__(master, **kwargs)
@@ -105,8 +267,21 @@ class LoadingFrame(SafeFrame):
         self.safe_after(300, self.start_loading)
 
     def start_loading(self):
-        thread = threading.Thread(target=self._do_loading, daemon=True)
-        thread.start()
+        # Daemon thread, not the app executor: opening the VISA RM can block for minutes
+        # and must not keep the process alive after the window is closed
+        threading.Thread(target=self._run_loading, daemon=True).start()
+
+    def _run_loading(self):
+        try:
+            self._do_loading()
+        except Exception as e:
+            traceback.print_exc()
+            self.safe_after(0, lambda err=e: self._loading_failed(err))
+
+    def _loading_failed(self, err):
+        self.status_label.configure(text="Startup failed")
+        self.detail_label.configure(text=str(err))
+        messagebox.showerror("Startup failed", str(err))
 
     def _update_ui(self, step_text, detail_text=None, progress=None):
         # Thread-safe UI updates via .after
@@ -128,16 +303,16 @@ class LoadingFrame(SafeFrame):
 
         # Step 1: Ensure folders
         self._update_ui(steps[0][0], steps[0][1], 0.05)
-        time.sleep(0.35)
         os.makedirs(DATA_FOLDER, exist_ok=True)
         os.makedirs(METHODS_FOLDER, exist_ok=True)
-        time.sleep(0.2)
+        os.makedirs(CUSTOM_METHODS_FOLDER, exist_ok=True)
         self._update_ui(steps[0][0], f"Folders ready: '{DATA_FOLDER}', '{METHODS_FOLDER}'", 0.15)
-        time.sleep(0.25)
 
+        # window closed meanwhile: skip the remaining steps
+        if self.controller.stop_event.is_set():
+            return
         # Step 2: Check modules
         self._update_ui(steps[1][0], "Checking: pyvisa, matplotlib, customtkinter", 0.25)
-        time.sleep(0.25)
         mods = {
             "pyvisa": module_exists("pyvisa"),
             "matplotlib": module_exists("matplotlib"),
@@ -146,33 +321,44 @@ class LoadingFrame(SafeFrame):
         }
         detail = ", ".join(f"{k}: {'OK' if v else 'Missing'}" for k, v in mods.items())
         self._update_ui(steps[1][0], detail, 0.45)
-        time.sleep(0.45)
 
+        # Read the method files here so MainPage doesn't block on disk I/O
+        methods = load_methods()
+        self._update_ui("Loading methods", f"Loaded {len(methods)} method(s).", 0.5)
+
+        if self.controller.stop_event.is_set():
+            return
         # Step 3: Scan VISA devices (if available)
         self._update_ui(steps[2][0], steps[2][1], 0.55)
         devices = []
+        rm = None
         if mods["pyvisa"]:
-            devices = safe_list_resources()
+            # Opening the RM can block for a long time, keep it off the Tk thread
+            try:
+                rm = pyvisa.ResourceManager('@py')
+            except Exception as e:
+                print(f"Could not open VISA resource manager: {e}")
+            devices = safe_list_resources(rm) if rm is not None else []
             devs_text = f"Found {len(devices)} device(s): {devices}" if devices else "No VISA devices found."
         else:
             devs_text = "pyvisa not installed — skipping device scan."
         self._update_ui(steps[2][0], devs_text, 0.75)
-        time.sleep(0.6)
 
+        if self.controller.stop_event.is_set():
+            return
         # Step 4: Finalize
         self._update_ui(steps[3][0], "Launching main UI...", 0.95)
-        time.sleep(0.5)
 
         # Prepare state to pass to main page
         initial_state = {
             "pyvisa_installed": mods["pyvisa"],
             "matplotlib_installed": mods["matplotlib"],
-            "visa_devices": devices
+            "visa_devices": devices,
+            "rm": rm,
+            "methods": methods
         }
 
-        # Short pause so progress bar is visible
         self._update_ui("Done", "Opening application...", 1.0)
-        time.sleep(0.4)
 
         # Switch to main page in main thread
         self.safe_after(0, lambda: self.controller.on_loading_done(initial_state))
@@ -191,16 +377,27 @@ class MainPage(ctk.CTkFrame):
         self.controller = controller
         self.initial_state = initial_state
 
-        # VISA Resource Manager
-        self.rm = pyvisa.ResourceManager('@py') ##Change to '@py'
+        # VISA Resource Manager (opened by the loader thread)
+        self.rm = initial_state.get("rm")
         self.device = None
+        self._refreshing = False
+        self._last_refresh = 0.0
+        # Whether the last device scan found anything; drives the status colour
+        self._devices_present = bool(initial_state.get("visa_devices"))
+        # Set only by _set_connected
+        self._connected = False
+        # Turned off for the session if the compound request ever fails
+        self._supports_compound_query = COMPOUND_ID_QUERY
+        # Last styling applied, so unchanged states skip configure()
+        self._indicator_color = None
+        self._disconnect_enabled = False
 
         # layout: left status bar + main area
         self.grid_rowconfigure(0, weight=1)
         self.grid_columnconfigure(1, weight=1)
 
         # Main tab view
-        self.tabview = ctk.CTkTabview(self, width=600)
+        self.tabview = ctk.CTkTabview(self, width=600, command=self._on_tab_changed)
         self.tabview.grid(row=0, column=1, sticky="nsew", padx=(8,16), pady=16)
         self.tabview.add("Config")
         self.tabview.add("Methods")
@@ -208,7 +405,8 @@ class MainPage(ctk.CTkFrame):
 
         self._build_config_tab()
         self._build_methods_tab()
-        self._build_new_method_tab()
+        # "New Method" is built the first time it is shown (see _on_tab_changed)
+        self._new_method_built = False
 
         # Left status indicator (rounded rectangle-like)
         self.status_frame = ctk.CTkFrame(self, width=80, corner_radius=20)
@@ -227,6 +425,35 @@ class MainPage(ctk.CTkFrame):
         # set initial status color based on initial_state
         self._update_status_color()
 
+        # Callbacks posted by worker threads, run on the Tk thread
+        self._ui_q = queue.Queue()
+        self._drain_after_id = self.after(50, self._drain_ui_queue)
+
+    def _drain_ui_queue(self):
+        try:
+            while True:
+                try:
+                    fn = self._ui_q.get_nowait()
+                except queue.Empty:
+                    break
+                try:
+                    fn()
+                except Exception:
+                    # one bad callback must not starve the rest of the queue
+                    traceback.print_exc()
+        finally:
+            # always keep the pump alive, unless a callback tore the page down
+            if not getattr(self, "_destroyed", False):
+                self._drain_after_id = self.after(50, self._drain_ui_queue)
+
+    def _on_task_done(self, future):
+        # Runs on the Tk thread; surface errors the worker would otherwise swallow
+        if future.cancelled():
+            return
+        exc = future.exception()
+        if exc is not None:
+            messagebox.showerror("Run failed", str(exc))
+
     def _build_config_tab(self):
         frame = self.tabview.tab("Config")
         frame.grid_columnconfigure(0, weight=1)
@@ -256,7 +483,7 @@ class MainPage(ctk.CTkFrame):
 
         # Device selection
         ctk.CTkLabel(frame, text="Available devices (VISA):").grid(row=row+6, column=0, sticky="w", padx=12, pady=(6,2))
-        self.device_combo = ctk.CTkComboBox(frame, values=self.initial_state.get("visa_devices", []), command=self._refresh_devices)
+        self.device_combo = ctk.CTkComboBox(frame, values=self.initial_state.get("visa_devices", []))
         self.device_combo.configure(state="readonly")
         self.device_combo.set("Refresh devices")
         self.device_combo.grid(row=row+7, column=0, sticky="we", padx=12, pady=(0,6))
@@ -278,7 +505,12 @@ class MainPage(ctk.CTkFrame):
         f = self.tabview.tab("Methods")
 
         # --- Load methods ---
-        self.methods = load_methods()
+        # Preloaded by the loader thread
+        self.methods = self.initial_state.get("methods")
+        if self.methods is None:
+            self.methods = load_methods()
+        # name -> method; the first file wins on duplicate names
+        self._methods_by_name = {m["name"]: m for m in reversed(self.methods)}
         method_names = [m["name"] for m in self.methods] if self.methods else ["No methods found"]
 
         # --- Top frame for dropdown + button ---
@@ -293,7 +525,7 @@ class MainPage(ctk.CTkFrame):
         # Button to show process
         def show_process():
             selected_name = self.method_combo.get()
-            method = next((m for m in self.methods if m["name"] == selected_name), None)
+            method = self._methods_by_name.get(selected_name)
             if method:
                 messagebox.showinfo(
                     f"Process: {method['name']}",
@@ -313,7 +545,9 @@ class MainPage(ctk.CTkFrame):
         plot_frame = ctk.CTkFrame(middle_frame)
         plot_frame.pack(side="left", fill="both", expand=True, padx=(0, 6), pady=6)
 
-        self.fig, self.ax = plt.subplots(figsize=(5, 4))
+        # Plain Figure, not pyplot-managed; the canvas draws once data arrives
+        self.fig = Figure(figsize=(5, 4))
+        self.ax = self.fig.add_subplot(111)
         self.ax.set_xlabel("Voltage (mV)")
         self.ax.set_ylabel("Current (A)")
         self.ax.grid(True)
@@ -330,114 +564,63 @@ class MainPage(ctk.CTkFrame):
         # Dictionary to store input widgets keyed by JSON "variable"
         self.input_widgets = {}
 
+        # Per-method (widgets, {variable: entry}), built once and re-gridded
+        self._method_widget_groups = {}
+        self._current_group = []
+        self._run_btn = None
+        self.progress_bar = None
+        # Fixed rows below any method's inputs for the Run button and progress bar
+        RUN_ROW = 1000
+
         # Function to populate inputs based on selected method
         def update_inputs(event=None):
-            # clear old widgets
-            for widget in self.inputs_frame.winfo_children():
-                widget.destroy()
+            # hide old widgets
+            for widget in self._current_group:
+                widget.grid_forget()
+            self._current_group = []
             self.input_widgets.clear()
 
             selected_name = self.method_combo.get()
-            method = next((m for m in self.methods if m["name"] == selected_name), None)
+            method = self._methods_by_name.get(selected_name)
             if not method:
                 return
 
-            row = 0
-            for inp in method.get("inputs", []):
-                label = ctk.CTkLabel(
-                    self.inputs_frame,
-                    text=inp["label"],
-                    wraplength=250,  # wrap long labels
-                    anchor="w"
-                )
-                label.grid(row=row, column=0, sticky="w", padx=6, pady=4)
-
-                entry = ctk.CTkEntry(self.inputs_frame)
-                entry.insert(0, str(inp.get("default", "")))
-                entry.grid(row=row, column=1, sticky="we", padx=6, pady=4)
-
-                self.input_widgets[inp["variable"]] = entry
-                row += 1
-
-            # Add Run button
-            run_btn = ctk.CTkButton(self.inputs_frame, text="Run Method", command=run_method)
-            run_btn.grid(row=row, column=0, columnspan=2, pady=(12, 4), sticky="we")
-
-            # Add progress bar under button
-            self.progress_bar = ctk.CTkProgressBar(self.inputs_frame)
-            self.progress_bar.grid(row=row+1, column=0, columnspan=2, sticky="we", padx=6, pady=(0, 6))
+            group = self._method_widget_groups.get(selected_name)
+            if group is None:
+                widgets, entries = [], {}
+                for inp in method.get("inputs", []):
+                    label = ctk.CTkLabel(
+                        self.inputs_frame,
+                        text=inp["label"],
+                        wraplength=250,  # wrap long labels
+                        anchor="w"
+                    )
+                    entry = ctk.CTkEntry(self.inputs_frame)
+                    entry.insert(0, str(inp.get("default", "")))
+                    widgets += (label, entry)
+                    entries[inp["variable"]] = entry
+                group = self._method_widget_groups[selected_name] = (widgets, entries)
+
+            widgets, entries = group
+            for i, widget in enumerate(widgets):
+                row, col = divmod(i, 2)
+                widget.grid(row=row, column=col, sticky="w" if col == 0 else "we", padx=6, pady=4)
+            self._current_group = widgets
+            self.input_widgets.update(entries)
+
+            if self._run_btn is None:
+                # Add Run button
+                self._run_btn = ctk.CTkButton(self.inputs_frame, text="Run Method", command=run_method)
+                self._run_btn.grid(row=RUN_ROW, column=0, columnspan=2, pady=(12, 4), sticky="we")
+
+                # Add progress bar under button
+                self.progress_bar = ctk.CTkProgressBar(self.inputs_frame)
+                self.progress_bar.grid(row=RUN_ROW + 1, column=0, columnspan=2, sticky="we", padx=6, pady=(0, 6))
             self.progress_bar.set(0.0)
 
         # Bind dropdown change
         self.method_combo.configure(command=update_inputs)
 
-        def split_commands(cmd_str):
-            """Split by commas but ignore commas inside parentheses."""
-            res = []
-            current = ""
-            parens = 0
-            for c in cmd_str:
-                if c == '(':
-                    parens += 1
-                elif c == ')':
-                    parens -= 1
-                if c == ',' and parens == 0:
-                    res.append(current)
-                    current = ""
-                else:
-                    current += c
-            if current:
-                res.append(current)
-            return res
-
-        def parse_process(process_str):
-            s = process_str.replace(" ", "").replace("\n", "")
-            repeat_pattern = re.compile(r'REPEAT\((\w+)\)\{(.*?)\}(?=:|$)')
-            repeat_matches = repeat_pattern.findall(s)
-            parsed = []
-
-            for repeat_var, inner_content in repeat_matches:
-                for_blocks = re.findall(r'FOR_RANGEV\(([^,]+),([^,]+),([^)]+)\)\{(.*?)\}', inner_content)
-                for_list = []
-
-                for start_var, end_var, step_var, commands_str in for_blocks:
-                    commands_raw = split_commands(commands_str)
-                    commands = []
-
-                    for cmd in commands_raw:
-                        cmatch = re.match(r'(\w+)\((.*)\)', cmd)
-                        if not cmatch:
-                            continue
-                        cmd_type = cmatch.group(1).upper()
-                        cmd_param = cmatch.group(2)
-
-                        if cmd_type == "MEAN":
-                            commands.append({"mean": cmd_param})
-                        elif cmd_type == "DELAY":
-                            commands.append({"delay": cmd_param})
-                        elif cmd_type == "OUTPUT":
-                            outputs = {}
-                            pairs = split_commands(cmd_param)
-                            for pair in pairs:
-                                if '=' in pair:
-                                    key, val = pair.split('=', 1)
-                                    outputs[key] = val
-                            commands.append({"outputs": outputs})
-
-                    for_list.append({
-                        "start": start_var,
-                        "end": end_var,
-                        "step": step_var,
-                        "commands": commands
-                    })
-
-                parsed.append({
-                    "repeats": repeat_var,
-                    "for_loops": for_list
-                })
-
-            return parsed
-
         def describe_process(parsed_process, input_widgets, show_messagebox=True):
             """
             Print and/or show a message box with a description
@@ -506,15 +689,15 @@ class MainPage(ctk.CTkFrame):
             if DEBUGGING:
                 print(f"Set Voltage of {voltage}mV")
             else:
-                self.device.write(f"SETE {V}")
+                self.device.write(f"SETE {voltage}")
 
         #Read current
         def readCurrent():
             if DEBUGGING:
                 response = [10,-2]
             else:
-                self.device.write("READI")
-                response = self.device.read().strip().split(',')
+                # one write+read round trip per sample
+                response = self.device.query("READI").strip().split(',')
             
             if len(response) == 2:
                 value, exp = map(float, response)
@@ -527,7 +710,7 @@ class MainPage(ctk.CTkFrame):
         # Run method simulation
         def run_method():
             selected_name = self.method_combo.get()
-            method = next((m for m in self.methods if m["name"] == selected_name), None)
+            method = self._methods_by_name.get(selected_name)
             if not method:
                 messagebox.showwarning("Warning", "Select a valid method first.")
                 return
@@ -536,91 +719,150 @@ class MainPage(ctk.CTkFrame):
 
             # Parse the process
             process_parsed = parse_process(method["process"])
-            
+
+            # --- Check user/project/experiment ---
+            user = self.user_combo.get()
+            project = self.project_combo.get()
+            experiment_name = self.experiment_entry.get().strip()
+
+            if not user or not project or not experiment_name:
+                messagebox.showwarning("Missing info", "Please select a user, project and enter an experiment name.")
+                return
+
+            # Print structured description before running
+            continue_method = describe_process(process_parsed, self.input_widgets, show_messagebox=True)
             if not continue_method:
                 return
 
-            def task():
-                # --- Check user/project/experiment ---
-                user = self.user_combo.get()
-                project = self.project_combo.get()
-                experiment_name = self.experiment_entry.get().strip()
+            # Snapshot the inputs now: the worker thread must not touch Tk widgets
+            values = {var: w.get() for var, w in self.input_widgets.items()}
 
-                if not user or not project or not experiment_name:
-                    messagebox.showwarning("Missing info", "Please select a user, project and enter an experiment name.")
+            # Reject inputs the sweep can't run with here, before the worker starts
+            for repeat_block in process_parsed:
+                repeat_var = repeat_block["repeats"]
+                try:
+                    cycles_val = int(values[repeat_var]) if repeat_var in values else 1
+                except ValueError:
+                    cycles_val = -1
+                if cycles_val < 0:
+                    messagebox.showwarning("Invalid input", f"Repeat count '{repeat_var}' must be a whole number of at least 0.")
                     return
+                for for_loop in repeat_block["for_loops"]:
+                    step_var = for_loop["step"]
+                    try:
+                        step_val = float(values[step_var]) if step_var in values else 0.1
+                    except ValueError:
+                        step_val = 0
+                    if step_val == 0:
+                        messagebox.showwarning("Invalid input", f"Step '{step_var}' must be a non-zero number.")
+                        return
+                    for cmd in for_loop["commands"]:
+                        if "mean" in cmd:
+                            param = cmd["mean"]
+                            try:
+                                r_val = int(values[param]) if param in values else 1
+                            except ValueError:
+                                r_val = 0
+                            if r_val < 1:
+                                messagebox.showwarning("Invalid input", f"Repetitions '{param}' must be a whole number of at least 1.")
+                                return
+
+            ui = self._ui_q.put
+            stop = self.controller.stop_event
 
-                # Print structured description before running
-                continue_method = describe_process(process_parsed, self.input_widgets, show_messagebox=True)
-
+            def task():
                 # --- Create CSV folder and filename ---
                 project_path = os.path.join(DATA_FOLDER, user, project)
                 os.makedirs(project_path, exist_ok=True)
 
                 # Generate unique filename with increment
-                base_fname = f"{experiment_name}.csv"
-                existing_files = [f for f in os.listdir(project_path) if f.startswith(experiment_name) and f.endswith(".csv")]
-                if existing_files:
-                    numbers = [int(re.search(r"_(\d+)\.csv$", f).group(1)) for f in existing_files if re.search(r"_(\d+)\.csv$", f)]
-                    next_num = max(numbers, default=0) + 1
-                    fname = f"{experiment_name}_{next_num:03d}.csv"
-                else:
-                    fname = f"{experiment_name}_001.csv"
+                next_num = 1
+                with os.scandir(project_path) as it:
+                    for entry in it:
+                        if entry.name.startswith(experiment_name):
+                            m = _NUM_RE.search(entry.name)
+                            if m:
+                                next_num = max(next_num, int(m.group(1)) + 1)
+                fname = f"{experiment_name}_{next_num:03d}.csv"
 
                 csv_path = os.path.join(project_path, fname)
                 print(f"Writing data to: {csv_path}")
 
-                study_voltages = []
-                study_currents = []
-
-                self.ax.cla()                # clear axes
-                self.ax.set_title("Measurement")  # optional: reset title
-                self.ax.set_xlabel("Voltage (mV)")
-                self.ax.set_ylabel("Current (A)")
-                self.canvas.draw_idle()
+                # Tk/matplotlib updates run on the main thread via the UI queue
+                def reset_plot():
+                    self.ax.cla()                # clear axes
+                    self.ax.set_title("Measurement")  # optional: reset title
+                    self.ax.set_xlabel("Voltage (mV)")
+                    self.ax.set_ylabel("Current (A)")
+                    # One line artist for the whole run, updated in place per sample
+                    self.line, = self.ax.plot([], [], 'bo-')
+                    self.canvas.draw_idle()
+
+                def update_plot(k, progress):
+                    self.line.set_data(study_voltages[:k], study_currents[:k])
+                    self.ax.relim()
+                    self.ax.autoscale_view()
+                    self.canvas.draw_idle()
+                    self.progress_bar.set(progress)
+
+                ui(reset_plot)
 
                 print("task started")
-                total_steps = 0
-
-                with open(csv_path, mode='w', newline='') as f:
+                self._last_ui_ns = 0
+
+                # Resolve every sweep's inputs once, up front
+                plan = []
+                bounds = []  # (start, end, step, cycles) per for loop
+                for repeat_block in process_parsed:
+                    repeat_var = repeat_block["repeats"]
+                    cycles_val = int(values[repeat_var]) if repeat_var in values else 1
+
+                    loops = []
+                    for for_loop in repeat_block["for_loops"]:
+                        # Safely get input values
+                        start_val = float(values[for_loop["start"]]) if for_loop["start"] in values else 0
+                        end_val = float(values[for_loop["end"]]) if for_loop["end"] in values else 1
+                        step_val = float(values[for_loop["step"]]) if for_loop["step"] in values else 0.1
+                        loops.append((for_loop, start_val, end_val, step_val))
+                        bounds.append((start_val, end_val, step_val, cycles_val))
+                    plan.append((repeat_var, cycles_val, loops))
+
+                # Points per sweep (last step included) and the run total
+                bounds = np.array(bounds, dtype=float).reshape(-1, 4)
+                n_points = (np.abs(bounds[:, 1] - bounds[:, 0]) / np.abs(bounds[:, 2])).astype(int) + 1
+                total_steps = int((bounds[:, 3] * n_points).sum())
+                print(f"Total simulation steps: {total_steps}")
+
+                # Preallocated sample buffers, filled by index as the sweep runs
+                study_voltages = np.empty(total_steps)
+                study_currents = np.empty(total_steps)
+                step_counter = 0
+                points = iter(n_points.tolist())
+
+                def write_rows(f, lo, hi):
+                    # Rows straight from the sample buffers; same text as csv.writer
+                    np.savetxt(f, np.column_stack((study_voltages[lo:hi], study_currents[lo:hi])),
+                               fmt='%s', delimiter=',', newline='\r\n')
+
+                # Samples are written in batches of 64; the rest is written before close
+                written = 0
+                with open(csv_path, mode='w', newline='', buffering=1 << 16) as f:
                     writer = csv.writer(f)
                     writer.writerow(["Voltage (mV)", "Current (A)"])
-                    for repeat_block in process_parsed:
-                        repeat_var = repeat_block["repeats"]
-                        cycles_widget = self.input_widgets.get(repeat_var)
-                        cycles_val = int(cycles_widget.get()) if cycles_widget else 1
-
-                        for for_loop in repeat_block["for_loops"]:
-                            start_widget = self.input_widgets.get(for_loop["start"])
-                            end_widget = self.input_widgets.get(for_loop["end"])
-                            step_widget = self.input_widgets.get(for_loop["step"])
-
-                            start_val = float(start_widget.get()) if start_widget else 0.0
-                            end_val = float(end_widget.get()) if end_widget else 1.0
-                            step_val = float(step_widget.get()) if step_widget else 0.1
-
-                            steps_in_loop = int(abs(end_val - start_val) / abs(step_val)) + 1  # include last step
-                            total_steps += cycles_val * steps_in_loop
-
-                    print(f"Total simulation steps: {total_steps}")
-
-                    step_counter = 0
-
-                    for repeat_block in process_parsed:
-                        repeat_var = repeat_block.get("repeat_var", "C")
-                        cycles_widget = self.input_widgets.get(repeat_var)
-                        cycles_val = int(cycles_widget.get()) if cycles_widget else 1
+                    for repeat_var, cycles_val, loops in plan:
+                        # Voltage vectors only depend on the inputs, build them once per sweep
+                        sweeps = []
+                        for for_loop, start_val, end_val, step_val in loops:
+                            # start + i*step avoids float drift
+                            step = abs(step_val) if start_val < end_val else -abs(step_val)
+                            V_values = start_val + np.arange(next(points)) * step
+                            sweeps.append((for_loop, start_val, end_val, step_val, V_values))
 
                         print(f"🔁 Repeat ({repeat_var}) → {cycles_val} times")
                         for c in range(cycles_val):
                             print(f"  Cycle {c+1}/{cycles_val}")
 
-                            for for_loop in repeat_block["for_loops"]:
-                                # Safely get input values
-                                start_val = float(self.input_widgets.get(for_loop["start"]).get()) if for_loop["start"] in self.input_widgets else 0
-                                end_val = float(self.input_widgets.get(for_loop["end"]).get()) if for_loop["end"] in self.input_widgets else 1
-                                step_val = float(self.input_widgets.get(for_loop["step"]).get()) if for_loop["step"] in self.input_widgets else 0.1
-
+                            for for_loop, start_val, end_val, step_val, V_values in sweeps:
                                 print(f"    ➤ For Loop: {for_loop['start']}={start_val} → {for_loop['end']}={end_val} step {step_val}")
 
                                 # Parse commands
@@ -631,69 +873,56 @@ class MainPage(ctk.CTkFrame):
                                 for cmd in for_loop["commands"]:
                                     if "mean" in cmd:
                                         param = cmd["mean"]
-                                        r_widget = self.input_widgets.get(param)
-                                        r_val = int(r_widget.get()) if r_widget else 1
+                                        r_val = int(values[param]) if param in values else 1
                                         print(f"      • Average for {r_val} repetitions ({param})")
                                     elif "delay" in cmd:
                                         param = cmd["delay"]
-                                        d_widget = self.input_widgets.get(param)
-                                        delay_val = float(d_widget.get()) if d_widget else 1.0
+                                        delay_val = float(values[param]) if param in values else 1.0
                                         print(f"      • Delay for {delay_val} s ({param})")
                                         time.sleep(delay_val * 0.1)  # simulate shorter delay for UI
 
-                                # Determine direction
-                                if start_val < end_val:
-                                    V_values = [v for v in frange(start_val, end_val, step_val)]
-                                else:
-                                    V_values = [v for v in frange(start_val, end_val, -abs(step_val))]
+                                # Reused for every point of this sweep
+                                current_buf = np.empty(r_val)
 
                                 # Loop over voltage range
                                 for V in V_values:
+                                    if stop.is_set():
+                                        # App closing: keep what was measured and let the worker exit
+                                        write_rows(f, written, step_counter)
+                                        return
                                     print(f"        → Voltage = {V:.3f}")
                                     setVoltage(V)
-                                    time.sleep(float(delay_val / 2))
+                                    # One settle sleep per point rather than r_val small ones
+                                    time.sleep(delay_val)
 
-                                    currents = []
-                                    for _ in range(r_val):
-                                        time.sleep(float(delay_val / (2 * r_val)))
-                                        currents.append(readCurrent())
+                                    for j in range(r_val):
+                                        current_buf[j] = readCurrent()
 
-                                    I_mean = sum(currents) / len(currents)
+                                    I_mean = current_buf.mean()
 
-                                    # --- Write to CSV ---
-                                    writer.writerow([V, I_mean])
-                                    f.flush()
-
-                                    # Store and plot
-                                    study_voltages.append(V)
-                                    study_currents.append(I_mean)
-                                    self.ax.plot(study_voltages, study_currents, 'bo-')
-                                    self.canvas.draw_idle()
+                                    # Store, write and plot
+                                    study_voltages[step_counter] = V
+                                    study_currents[step_counter] = I_mean
 
                                     step_counter += 1
-                                    self.progress_bar.set(step_counter / total_steps)
-                                    self.update_idletasks()
+                                    if step_counter - written >= 64:
+                                        write_rows(f, written, step_counter)
+                                        written = step_counter
+                                    # Redraw at most ~30 Hz; the final update is posted after the sweep
+                                    now = time.monotonic_ns()
+                                    if now - self._last_ui_ns > 33_000_000:
+                                        self._last_ui_ns = now
+                                        ui(lambda k=step_counter, p=step_counter / total_steps: update_plot(k, p))
+
+                    write_rows(f, written, step_counter)
 
                 print("✅ Process complete.")
-                self.progress_bar.set(1.0)
-                messagebox.showinfo("Finished", "Method simulation completed!")
-
-            # Utility for float ranges
-            def frange(start, stop, step):
-                vals = []
-                x = start
-                if step > 0:
-                    while x <= stop:
-                        vals.append(x)
-                        x += step
-                else:
-                    while x >= stop:
-                        vals.append(x)
-                        x += step
-                return vals
-
-            # Run on background thread
-            threading.Thread(target=task, daemon=True).start()
+                ui(lambda k=step_counter: update_plot(k, 1.0))
+                ui(lambda: messagebox.showinfo("Finished", "Method simulation completed!"))
+
+            # Run on the app's worker thread
+            future = self.controller.executor.submit(task)
+            future.add_done_callback(lambda f: self._ui_q.put(lambda: self._on_task_done(f)))
 
     # def _build_new_method_tab(self):
     #     f = self.tabview.tab("New Method")
@@ -814,6 +1043,11 @@ class MainPage(ctk.CTkFrame):
 
 
 
+    def _on_tab_changed(self):
+        if self.tabview.get() == "New Method" and not self._new_method_built:
+            self._new_method_built = True
+            self._build_new_method_tab()
+
     def _build_new_method_tab(self):
         f = self.tabview.tab("New Method")
 
@@ -1016,20 +1250,27 @@ class MainPage(ctk.CTkFrame):
         }
 
         # ---- 6. Save JSON to file ----
-        folder = os.path.join("Methods", "Custom")
-        os.makedirs(folder, exist_ok=True)
-        filename_base = os.path.join(folder, f"{name}.json")
+        # CUSTOM_METHODS_FOLDER is created by the loader at startup
+        filename_base = os.path.join(CUSTOM_METHODS_FOLDER, f"{name}.json")
         filename = filename_base
         counter = 1
         while os.path.exists(filename):
             filename = filename_base.replace(".json", f"_{counter:03d}.json")
             counter += 1
 
-        with open(filename, "w") as f:
-            json.dump(method_dict, f, indent=2)
+        try:
+            write_json(method_dict, filename)
+        except Exception as e:
+            messagebox.showerror("Error", f"Could not save {filename}:\n{e}")
+            return
 
         messagebox.showinfo("Saved", f"Method '{name}' saved to {filename}")
 
+        # Make it selectable in the Methods tab right away
+        self.methods.append(method_dict)
+        self._methods_by_name.setdefault(name, method_dict)
+        self.method_combo.configure(values=[m["name"] for m in self.methods])
+
         # ---- 7. Reset page ----
         self.method_name_entry.delete(0, "end")
         self.method_desc_entry.delete(0, "end")
@@ -1060,7 +1301,7 @@ class MainPage(ctk.CTkFrame):
     def _list_users(self):
         users = []
         try:
-            users = [d for d in os.listdir(DATA_FOLDER) if os.path.isdir(os.path.join(DATA_FOLDER, d))]
+            users = list_subdirs(DATA_FOLDER)
         except Exception:
             users = []
         return users
@@ -1069,10 +1310,7 @@ class MainPage(ctk.CTkFrame):
         projects = []
         try:
             user = self.user_combo.get()  # <-- get current combo value
-            projects = [
-                d for d in os.listdir(os.path.join(DATA_FOLDER, user))
-                if os.path.isdir(os.path.join(DATA_FOLDER, user, d))
-            ]
+            projects = list_subdirs(os.path.join(DATA_FOLDER, user))
         except Exception:
             projects = []
         return projects
@@ -1080,29 +1318,47 @@ class MainPage(ctk.CTkFrame):
     def _on_user_selected(self, event=None):
         self.reload_project_combo()
 
-    def reload_project_combo(self):
+    def reload_project_combo(self, projects=None, select=None):
+        # projects: a listing the caller already has, to skip listing the folder again
         if not hasattr(self, "project_combo"):
             print("Project combo not yet created — skipping reload.")
             return
 
-        projects = self._list_projects()
+        if projects is None:
+            projects = self._list_projects()
         if projects:
-            self.project_combo.configure(values=projects, state="readonly")
-            self.project_combo.set(projects[0])
+            self._set_combo_values(self.project_combo, projects, state="readonly")
+            self.project_combo.set(select if select in projects else projects[0])
         else:
             self.project_combo.set("No projects found")
-            self.project_combo.configure(values=[], state="disabled")
+            self._set_combo_values(self.project_combo, [], state="disabled")
+
+    def _set_combo_values(self, combo, values, **kwargs):
+        # configure(values=...) rebuilds the dropdown; skip it when nothing would change
+        if tuple(combo.cget("values") or ()) == tuple(values) and all(combo.cget(k) == v for k, v in kwargs.items()):
+            return
+        combo.configure(values=values, **kwargs)
 
     def _new_user_popup(self):
-        name = simpledialog.askstring("New User", "Enter new user/folder name:")
+        name = ctk.CTkInputDialog(title="New User", text="Enter new user/folder name:").get_input()
         if name:
+            if not valid_folder_name(name):
+                messagebox.showwarning("Invalid name", f"'{name}' must be a single folder name, without path separators.")
+                return
             path = os.path.join(DATA_FOLDER, name)
             try:
+                # The listing snapshot feeds the combo afterwards; lexists also catches
+                # symlinks and files the listing leaves out
+                if name in list_subdirs(DATA_FOLDER) or os.path.lexists(path):
+                    messagebox.showwarning("Exists", f"Folder already exists: {path}")
+                    return
                 os.makedirs(path, exist_ok=True)
-                self.user_combo.configure(values=self._list_users())
+                users = add_subdir(DATA_FOLDER, name)
+                self._set_combo_values(self.user_combo, users)
                 messagebox.showinfo("Created", f"Created folder: {path}")
                 self.user_combo.set(name)
-                self.reload_project_combo()
+                # A brand-new user folder has no projects yet
+                self.reload_project_combo(projects=[])
             except Exception as e:
                 messagebox.showerror("Error", str(e))
 
@@ -1111,26 +1367,61 @@ class MainPage(ctk.CTkFrame):
         if not user:
             messagebox.showwarning("Select user", "Please select a user folder first.")
             return
-        name = simpledialog.askstring("New Project", "Enter new project/folder name:")
+        name = ctk.CTkInputDialog(title="New Project", text="Enter new project/folder name:").get_input()
         if name:
-            path = os.path.join(DATA_FOLDER, user, name)
+            if not valid_folder_name(name):
+                messagebox.showwarning("Invalid name", f"'{name}' must be a single folder name, without path separators.")
+                return
+            user_path = os.path.join(DATA_FOLDER, user)
+            path = os.path.join(user_path, name)
             try:
+                if name in list_subdirs(user_path) or os.path.lexists(path):
+                    messagebox.showwarning("Exists", f"Folder already exists: {path}")
+                    return
                 os.makedirs(path, exist_ok=True)
+                projects = add_subdir(user_path, name)
                 messagebox.showinfo("Created", f"Created folder: {path}")
-                self.reload_project_combo()
+                self.reload_project_combo(projects, select=name)
             except Exception as e:
                 messagebox.showerror("Error", str(e))
 
     def _refresh_devices(self):
-        # refresh VISA device list
-        devices = safe_list_resources()
-        self.device_combo.configure(values=devices)
+        # refresh VISA device list; list_resources can block for seconds, so scan off the Tk thread
+        if self._refreshing:
+            return
+        # Collapse refreshes less than 0.5 s apart into one scan
+        now = time.monotonic()
+        if now - self._last_refresh < 0.5:
+            return
+        self._last_refresh = now
+        self._refreshing = True
+        self.refresh_btn.configure(state="disabled")
+        # "Scanning..." is not a resource name: keep Connect off until the result is in
+        self.connect_btn.configure(state="disabled")
+        previous = self.device_combo.get()
+        self.device_combo.set("Scanning...")
+
+        def scan():
+            # List on the loader's '@py' RM only: a default-backend listing couldn't be opened
+            devices = safe_list_resources(self.rm) if self.rm is not None else []
+            self._ui_q.put(lambda: self._apply_devices(devices, previous))
+
+        # Own thread, so a scan never waits behind a running method on the app worker
+        threading.Thread(target=scan, daemon=True).start()
+
+    def _apply_devices(self, devices, previous=None):
+        # Runs on the Tk thread with the scan result
+        self._refreshing = False
+        self.refresh_btn.configure(state="normal")
+        self._devices_present = bool(devices)
+        self._set_combo_values(self.device_combo, devices)
         # adjust connect button
         if devices:
             self.connect_btn.configure(state="normal")
-            self.device_combo.set(devices[0])
+            # keep the user's pick if the device is still there
+            self.device_combo.set(previous if previous in devices else devices[0])
         else:
-            self.device_combo.set("No devices found")
+            self.device_combo.set("VISA backend unavailable" if self.rm is None else "No devices found")
             self.connect_btn.configure(state="disabled")
         # update status colour
         self._update_status_color()
@@ -1140,12 +1431,17 @@ class MainPage(ctk.CTkFrame):
         if not dev:
             messagebox.showwarning("No device", "Select a device first.")
             return
+        if self.rm is None:
+            messagebox.showerror("Connection failed", "VISA backend unavailable: the '@py' resource manager could not be opened.")
+            return
         # For now, attempt to open resource to test connection (non-blocking quick test)
         try:
             self.device = self.rm.open_resource(dev)
             self.device.read_termination = '\r\n'
             self.device.write_termination = '\r\n'
             self.device.timeout = 5000
+            # Bigger transfer chunks so a reply isn't split over many low-level reads
+            self.device.chunk_size = 102400
 
             # Initialize device
             self.device.write("MODE 2")  # potentiostat mode
@@ -1155,17 +1451,10 @@ class MainPage(ctk.CTkFrame):
             # attempt ID or IDN
             try:
                 # Query ID, Version, Error
-                self.device.write("ID")
-                dev_id = self.device.read().strip()
-
-                self.device.write("VER")
-                version = self.device.read().strip()
-
-                self.device.write("ERR")
-                error = self.device.read().strip()
+                dev_id, version, error = self._query_identity()
 
                 messagebox.showinfo("Connected",
-                            f"Connected to {dev_name}\n\n"
+                            f"Connected to {dev}\n\n"
                             f"ID: {dev_id}\n"
                             f"Version: {version}\n"
                             f"Error: {error}")
@@ -1174,19 +1463,41 @@ class MainPage(ctk.CTkFrame):
 
             # Mark as connected (for now simply set the indicator and enable disconnect)
             self._set_connected(True)
-            messagebox.showinfo("Connected", f"Connection test to {dev} completed (quick test).")
         except Exception as e:
             messagebox.showerror("Connection failed", f"Could not open {dev}:\n{e}")
             self._set_connected(False)
 
+    def _query_identity(self):
+        """Return (ID, VER, ERR), in one request when the firmware chains commands."""
+        if self._supports_compound_query:
+            try:
+                # One request; the three replies arrive as separate lines
+                dev_id = self.device.query("ID;VER;ERR").strip()
+                version = self.device.read().strip()
+                error = self.device.read().strip()
+                return dev_id, version, error
+            except Exception:
+                # Not supported (timed out): don't probe again this session
+                self._supports_compound_query = False
+                try:
+                    self.device.clear()  # drop any partial reply
+                    # read and discard the error the rejected request raised,
+                    # so the ERR query below reports the device's real state
+                    self.device.query("ERR")
+                except Exception:
+                    pass
+        return tuple(self.device.query(cmd).strip() for cmd in ("ID", "VER", "ERR"))
+
     def _set_connected(self, connected: bool):
-        if connected:
-            self.disconnect_btn.configure(state="normal", fg_color=self.cget("fg_color"))
-            # store state if needed
-            self.controller.connected = True
-        else:
-            self.disconnect_btn.configure(state="disabled", fg_color=self.status_frame.cget("fg_color"))
-            self.controller.connected = False
+        self._connected = connected
+        # store state if needed
+        self.controller.connected = connected
+        if connected != self._disconnect_enabled:
+            self._disconnect_enabled = connected
+            if connected:
+                self.disconnect_btn.configure(state="normal", fg_color=self.cget("fg_color"))
+            else:
+                self.disconnect_btn.configure(state="disabled", fg_color=self.status_frame.cget("fg_color"))
         self._update_status_color()
 
     def _ask_disconnect(self):
@@ -1194,7 +1505,7 @@ class MainPage(ctk.CTkFrame):
             return
         if messagebox.askyesno("Disconnect", "Are you sure you want to disconnect the device?"):
             # Here we would safely send the "CELL 0" or close instrument safely.
-            if self.device:
+            if self.device is not None:
                 try:
                     self.device.write("CELL 0")  # turn cell OFF
                     self.device.close()
@@ -1203,33 +1514,41 @@ class MainPage(ctk.CTkFrame):
             self.device = None
             self._set_connected(False)
             messagebox.showinfo("Disconnected", "Device disconnected.")
-            self._update_status_color()
 
     def _update_status_color(self):
         # Decide color:
         # - red: pyvisa missing or no devices found
         # - blue: devices found but not connected
         # - green: connected
-        connected = self.device
-        devices = self.device_combo.cget("values") or []
-
-        if connected:
+        if self._connected:
             color = "#2ecc71"  # green
-        elif devices:
+        elif self._devices_present:
             color = "#3498db"  # blue
         else:
             color = "#e74c3c"  # red
 
         # apply color to indicator
+        if color == self._indicator_color:
+            return
+        self._indicator_color = color
         self.indicator.configure(fg_color=color)
-    
-    class MainPage(ctk.CTkFrame):
-        def destroy(self):
-            # destroy matplotlib canvas safely
-            if hasattr(self, "canvas"):
-                self.canvas.get_tk_widget().destroy()
-                plt.close(self.fig)  # close the figure
-            super().destroy()
+
+    def destroy(self):
+        # Only teardown path for the plot, however many times destroy is called
+        if getattr(self, "_destroyed", False):
+            return
+        self._destroyed = True
+        # stop the UI-queue pump before its widgets go away
+        if getattr(self, "_drain_after_id", None) is not None:
+            self.after_cancel(self._drain_after_id)
+            self._drain_after_id = None
+        # destroy matplotlib canvas safely
+        if getattr(self, "canvas", None) is not None:
+            self.canvas.get_tk_widget().destroy()
+            self.canvas = None
+        if getattr(self, "fig", None) is not None:
+            self.fig.clf()  # free the artists and Agg buffers now
+        super().destroy()
 
 class App(ctk.CTk):
     def __init__(self):
@@ -1244,20 +1563,34 @@ class App(ctk.CTk):
         self.eval('tk::PlaceWindow . center')
 
         self.connected = False
+        # One background worker for loading and method runs
+        self.executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="egg-io")
+        self.stop_event = threading.Event()
         self.loading_frame = LoadingFrame(self, self)
         self.loading_frame.pack(fill="both", expand=True)
         self.protocol("WM_DELETE_WINDOW", self.on_close)
 
+    def _after(self, ms, fn, *args):
+        # self.after, tracked so on_close can cancel whatever is still pending
+        after_id = self.after(ms, fn, *args)
+        self._after_ids.append(after_id)
+        return after_id
+
     def on_close(self, event=None):
+        # Worker threads aren't daemons: stop a running sweep and drop queued work
+        self.stop_event.set()
+        self.executor.shutdown(wait=False, cancel_futures=True)
+        for after_id in self._after_ids:
+            try:
+                self.after_cancel(after_id)
+            except Exception:
+                pass
+        self._after_ids.clear()
         if hasattr(self, "main_page"):
-            if hasattr(self.main_page, "canvas"):
-                self.main_page.canvas.get_tk_widget().destroy()
-            if hasattr(self.main_page, "fig"):
-                plt.close(self.main_page.fig)
             self.main_page.destroy()
         if hasattr(self, "loading_frame"):
             self.loading_frame.destroy()
-        self.after(50, self.destroy)  # destroy root slightly later
+        self._after(50, self.destroy)  # destroy root slightly later
 
     def on_loading_done(self, initial_state):
         # destroy loading and show main page